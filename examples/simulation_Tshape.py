@@ -5,7 +5,6 @@ from parameters_Tshape import *
 from tqdm import tqdm
 from utils import *
 from rich import print
-import numpy as np
 import sys
 
 
@@ -27,28 +26,28 @@ def main():
         simulation.add_particles_from_list([], [], [], list_part_right)
         simulation.build()
         print(simulation.lattice.visualize_lattice())
-        n_part = simulation.lattice.particles.sum().item()
-        n_part_init = np.copy(n_part)
+        n_part = simulation.lattice.n_particles
+        n_part_init = n_part
         n_sink_left = 0
         n_sink_up = 0
         n_sink_down = 0
         it = 0
         while n_part > 0:
             event = simulation.run()
-            n_part_new = simulation.lattice.particles.sum().item()
+            n_part_new = simulation.lattice.n_particles
             if n_part_new < n_part:
                 if event.x == 1:
                     n_sink_left += 1
-                    this_real.extend([np.copy(simulation.t).item(), 0])
+                    this_real.extend([float(simulation.t), 0])
                 elif event.y == 1:
                     n_sink_up += 1
-                    this_real.extend([np.copy(simulation.t).item(), 1])
+                    this_real.extend([float(simulation.t), 1])
                 elif event.y == height - 2:
                     n_sink_down += 1
-                    this_real.extend([np.copy(simulation.t).item(), 2])
+                    this_real.extend([float(simulation.t), 2])
                 else:
                     print(event)
-                n_part = np.copy(n_part_new)
+                n_part = n_part_new
             if it % 100 == 0:
                 print(simulation.lattice.visualize_lattice())
                 print("\n")
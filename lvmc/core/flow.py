@@ -1,4 +1,5 @@
 import torch
+from typing import Optional
 from lvmc.core.particle_lattice import Orientation, ParticleLattice
 
 
@@ -24,56 +25,51 @@ class Flow:
 
         # add checks later for velocity_field and vorticity_field to be of the right shape
 
-    def compute_tm(self, mask: torch.Tensor):
+    def compute_tm(self, mask: torch.Tensor, rows: Optional[torch.Tensor] = None):
         """Compute the migration rate terms due to transport by the flow
         :param mask: a tensor of shape (height, width) with 1 for the cells where particles are present and 0 otherwise
-        :return: a tensor of shape (height, width, len(Orientation)) with the migration rate terms
+        :param rows: indices of the rows to compute, all the rows if None
+        :return: a tensor of shape (len(Orientation), len(rows), width) with the migration rate terms
         """
-        tm = torch.zeros(
-            (len(Orientation), self.height, self.width), dtype=torch.float32
-        )
+        if rows is None:
+            rows = torch.arange(self.height)
+        vx = self.velocity_field[0, rows]
+        vy = self.velocity_field[1, rows]
+        row_mask = mask[rows]
+
+        tm = torch.zeros((len(Orientation), len(rows), self.width), dtype=torch.float32)
 
         tm[Orientation.RIGHT.value] = (
-            self.velocity_field[0, :, :]
-            * mask
-            * ~mask.roll(shifts=-1, dims=1)
-            * (self.velocity_field[0, :, :] > 0)
+            vx * row_mask * ~row_mask.roll(shifts=-1, dims=1) * (vx > 0)
         )
         tm[Orientation.LEFT.value] = (
-            -self.velocity_field[0, :, :]
-            * mask
-            * ~mask.roll(shifts=1, dims=1)
-            * (self.velocity_field[0, :, :] < 0)
+            -vx * row_mask * ~row_mask.roll(shifts=1, dims=1) * (vx < 0)
         )
         tm[Orientation.UP.value] = (
-            self.velocity_field[1, :, :]
-            * mask
-            * ~mask.roll(shifts=-1, dims=0)
-            * (self.velocity_field[1, :, :] > 0)
+            vy * row_mask * ~mask[(rows + 1) % self.height] * (vy > 0)
         )
         tm[Orientation.DOWN.value] = (
-            -self.velocity_field[1, :, :]
-            * mask
-            * ~mask.roll(shifts=1, dims=0)
-            * (self.velocity_field[1, :, :] < 0)
+            -vy * row_mask * ~mask[(rows - 1) % self.height] * (vy < 0)
         )
         return tm
 
-    def compute_tr(self, lattice: ParticleLattice):
+    def compute_tr(self, lattice: ParticleLattice, rows: Optional[torch.Tensor] = None):
         """Compute the reorientation rate terms due to rotation by the flow
-        :param mask: a tensor of shape (height, width) with 1 for the cells where particles are present and 0 otherwise
-        :return: a tensor of shape (height, width, len(Orientation)) with the reorientation rate terms
+        :param lattice: the lattice holding the particles
+        :param rows: indices of the rows to compute, all the rows if None
+        :return: a tensor of shape (len(Orientation), len(rows), width) with the reorientation rate terms
         """
-        tr = torch.zeros(
-            (len(Orientation), self.height, self.width), dtype=torch.float32
-        )
+        if rows is None:
+            rows = torch.arange(self.height)
+        particles = lattice.particles[:, rows]
+        positive_vorts = self.positive_vorts[rows]
 
         tr = (
             0.5
-            * self.vorticity_field
+            * self.vorticity_field[rows]
             * (
-                self.positive_vorts * lattice.particles.roll(shifts=1, dims=0)
-                ^ (~self.positive_vorts) * lattice.particles.roll(shifts=-1, dims=0)
+                positive_vorts * particles.roll(shifts=1, dims=0)
+                ^ (~positive_vorts) * particles.roll(shifts=-1, dims=0)
             )
         )
         return tr
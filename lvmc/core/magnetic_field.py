@@ -1,5 +1,4 @@
-from lvmc.core.particle_lattice import ParticleLattice, Orientation  # for type hinting
-import numpy as np
+from lvmc.core.particle_lattice import ParticleLattice  # for type hinting
 
 
 class MagneticField:
@@ -37,26 +36,15 @@ class MagneticField:
         # Rotate the lattice by 90 degrees in the prescribed direction, using numpy.roll
         lattice.particles[...] = lattice.particles.roll(self.current_direction, dims=0)
 
-        # Function to safely get the value from an Orientation or return a placeholder
-        def get_orientation_value(orientation):
-            return -1 if orientation is None else orientation.value
-
-        # Vectorize the function
-        get_value_vectorized = np.vectorize(get_orientation_value)
-
-        # Apply the function to the orientation map
-        numeric_orientation_map = get_value_vectorized(lattice.orientation_map)
-
-        # Apply rotation
-        if self.current_direction == 1:  # Clockwise rotation
-            numeric_orientation_map = (numeric_orientation_map + 1) % 4
-        elif self.current_direction == -1:  # Counterclockwise rotation
-            numeric_orientation_map = (numeric_orientation_map - 1) % 4
-
-        # Convert back to Orientation enum, handling the placeholder
-        lattice.orientation_map = np.vectorize(
-            lambda x: None if x == -1 else Orientation(x)
-        )(numeric_orientation_map)
+        # Rotate the orientation map accordingly, leaving empty cells untouched
+        occupied = lattice.orientation_map != lattice.EMPTY
+        lattice.orientation_map[occupied] = (
+            lattice.orientation_map[occupied] + self.current_direction % 4
+        ) % 4
+        lattice.orientation_counts = [
+            lattice.orientation_counts[(k - self.current_direction) % 4]
+            for k in range(4)
+        ]
 
     def get_current_direction(self) -> int:
         """
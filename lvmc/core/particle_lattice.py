@@ -1,5 +1,4 @@
 import torch
-import torch.nn.functional as F
 import numpy as np
 import warnings
 from enum import Enum
@@ -28,6 +27,10 @@ class ParticleLattice:
     ############################################
 
     NUM_ORIENTATIONS = len(Orientation)  # Class level constant
+    EMPTY = 255  # Sentinel value of the orientation map for empty cells
+    # Lattice displacements of each orientation, indexed by orientation value
+    _DX = (0, -1, 0, 1)
+    _DY = (-1, 0, 1, 0)
 
     def __init__(self, width: int, height: int, generator: torch.Generator = None):
         """
@@ -47,27 +50,36 @@ class ParticleLattice:
         )
         self.obstacles = torch.zeros((height, width), dtype=torch.bool, device=device)
         self.sinks = torch.zeros((height, width), dtype=torch.bool, device=device)
+        # Host copies of the obstacles and sinks for the single cell queries
+        self._obstacle_map = np.zeros((height, width), dtype=bool)
+        self._sink_map = np.zeros((height, width), dtype=bool)
+        self._n_obstacles = 0  # Number of obstacle cells, updated with the obstacles
 
-        # Initialize an array to store orientations of particles
+        # Initialize a byte array to store orientations of particles, one byte per cell
         self.orientation_map = np.full(
-            (height, width), None
-        )  # None indicates no particle
+            (height, width), self.EMPTY, dtype=np.uint8
+        )  # EMPTY indicates no particle
         self.occupancy_map = torch.zeros(
             (height, width), dtype=torch.bool, device=device
         )
+        # Number of particles with each orientation, updated incrementally
+        self.orientation_counts = [0] * self.NUM_ORIENTATIONS
 
         # Particle tracking
         self.id_to_position = {}  # Dictionary to track particles
         self.position_to_particle_id = {}  # Dictionary to map positions to particle IDs
         self.next_particle_id = 0  # Counter to assign unique IDs to particles
 
-        # Precompute deltas for each orientation
-        self.orientation_deltas = {
-            Orientation.UP: (0, -1),
-            Orientation.DOWN: (0, 1),
-            Orientation.LEFT: (-1, 0),
-            Orientation.RIGHT: (1, 0),
-        }
+        # Signed mixing matrix giving, for each orientation, the number of aligned
+        # neighbours minus the number of neighbours with the opposite orientation
+        self._tr_mix = torch.tensor(
+            [[1, 0, -1, 0], [0, 1, 0, -1], [-1, 0, 1, 0], [0, -1, 0, 1]],
+            dtype=torch.float32,
+            device=device,
+        )
+
+        # Row indices reused by the transition rates computations
+        self._rows = torch.arange(height, device=device)
 
     def get_params(self) -> dict:
         """
@@ -111,6 +123,24 @@ class ParticleLattice:
             Orientation.RIGHT.value: "→",
         }
 
+    def _get_cell_states(self) -> np.ndarray:
+        """
+        Get an integer code describing the content of every cell, for visualization.
+        Codes 0 to NUM_ORIENTATIONS - 1 are particles with the corresponding orientation,
+        followed by empty cells, obstacles, empty sinks and particles in a sink.
+
+        :return: A (height, width) array of cell state codes.
+        """
+        empty, obstacle, sink, particle_in_sink = range(
+            self.NUM_ORIENTATIONS, self.NUM_ORIENTATIONS + 4
+        )
+        occupied = self.orientation_map != self.EMPTY
+        states = np.where(occupied, self.orientation_map, empty)
+        states = np.where(
+            self._sink_map, np.where(occupied, particle_in_sink, sink), states
+        )
+        return np.where(self._obstacle_map, obstacle, states)
+
     def _is_empty(self, x: int, y: int) -> bool:
         """
         Check if a cell is empty.
@@ -119,7 +149,7 @@ class ParticleLattice:
         :param y: y-coordinate of the lattice.
         :return: True if the no particle is present at the cell, False otherwise.
         """
-        return not self.occupancy_map[y, x]
+        return bool(self.orientation_map[y, x] == self.EMPTY)
 
     def _get_target_position(self, x: int, y: int, orientation) -> tuple:
         """
@@ -138,9 +168,10 @@ class ParticleLattice:
         self._validate_occupancy(x, y)
 
         # Calculate new position based on orientation
-        delta_x, delta_y = self.orientation_deltas[orientation]
-        new_x, new_y = (x + delta_x) % self.width, (y + delta_y) % self.height
-        return new_x, new_y
+        return (
+            (x + self._DX[orientation.value]) % self.width,
+            (y + self._DY[orientation.value]) % self.height,
+        )
 
     def _is_obstacle(self, x: int, y: int) -> bool:
         """
@@ -157,7 +188,7 @@ class ParticleLattice:
         ValueError: If the coordinates are out of the lattice bounds.
         """
         self._validate_coordinates(x, y)
-        return self.obstacles[y, x] == 1
+        return bool(self._obstacle_map[y, x])
 
     def _is_sink(self, x: int, y: int) -> bool:
         """
@@ -174,7 +205,7 @@ class ParticleLattice:
         IndexError: If the coordinates are out of the lattice bounds.
         """
         self._validate_coordinates(x, y)
-        return self.sinks[y, x] == 1
+        return bool(self._sink_map[y, x])
 
     def _validate_availability(self, x: int, y: int) -> None:
         """
@@ -234,19 +265,17 @@ class ParticleLattice:
         """
         Returns the density of the lattice, calculated as the ratio of occupied cells to total cells.
         """
-        num_occupied_cells = (
-            self.particles.any(dim=0).sum().item()
-        )  # Count occupied cells
-        total_cells = self.width * self.height - self.obstacles.sum().item()
+        num_occupied_cells = self.n_particles  # Count occupied cells
+        total_cells = self.width * self.height - self._n_obstacles
         return num_occupied_cells / total_cells if total_cells > 0 else 0
 
     @property
     def n_particles(self):
-        return self.particles.sum().item()
+        return sum(self.orientation_counts)
 
     @property
     def is_empty(self):
-        return torch.all(~self.occupancy_map)
+        return self.n_particles == 0
 
     ###################################
     ## Particle Manipulation Methods ##
@@ -274,8 +303,9 @@ class ParticleLattice:
         self._validate_availability(x, y)
 
         self.particles[orientation.value, y, x] = True  # Add particle to the lattice
-        self.orientation_map[y, x] = orientation
+        self.orientation_map[y, x] = orientation.value
         self.occupancy_map[y, x] = True
+        self.orientation_counts[orientation.value] += 1
 
         self._update_tracking(
             int(self.next_particle_id), int(x), int(y)
@@ -283,6 +313,81 @@ class ParticleLattice:
 
         self.next_particle_id += 1  # increment the next particle id
 
+    def add_particles(
+        self,
+        xs: List[int],
+        ys: List[int],
+        orientation: Union[Optional[Orientation], List[Orientation]],
+    ) -> int:
+        """
+        Add particles at several positions at once. Either all the particles are added or,
+        if any position is invalid, none of them.
+
+        :param xs: x-coordinates of the particles.
+        :param ys: y-coordinates of the particles.
+        :param orientation: Orientation of the particles, as an instance of the Orientation enum,
+            or a list with the orientation of each particle. Random orientations are drawn for
+            each particle if None.
+        :return: The number of particles added to the lattice.
+        """
+        is_list = isinstance(orientation, (list, tuple))
+        if is_list and not all(isinstance(o, Orientation) for o in orientation):
+            raise ValueError("orientation must be an instance of Orientation enum.")
+
+        xs = torch.as_tensor(xs, dtype=torch.long, device=device)
+        ys = torch.as_tensor(ys, dtype=torch.long, device=device)
+        if xs.dim() != 1 or ys.dim() != 1 or len(xs) != len(ys):
+            raise ValueError("xs and ys must be 1-D sequences of equal length.")
+        if is_list and len(orientation) != len(xs):
+            raise ValueError("There must be one orientation per particle.")
+
+        # Validate all the target cells at once
+        if ((xs < 0) | (xs >= self.width) | (ys < 0) | (ys >= self.height)).any():
+            raise IndexError("Some coordinates are out of lattice bounds.")
+        if self.obstacles[ys, xs].any():
+            raise ValueError("Some sites are obstacles.")
+        n_distinct = torch.unique(ys * self.width + xs).numel()
+        if self.occupancy_map[ys, xs].any() or n_distinct < len(xs):
+            raise ValueError("Some sites are not empty.")
+
+        if is_list:
+            orientations = torch.tensor(
+                [o.value for o in orientation], dtype=torch.long, device=device
+            )
+        else:
+            orientations = self._get_orientations(orientation, len(xs))
+        self._add_particles(xs, ys, orientations)
+        return len(xs)
+
+    def _add_particles(
+        self, xs: torch.Tensor, ys: torch.Tensor, orientations: torch.Tensor
+    ) -> None:
+        """
+        Add several particles at once, writing every lattice structure in bulk.
+        The target cells are assumed to be empty and free of obstacles.
+
+        :param xs: x-coordinates of the particles.
+        :param ys: y-coordinates of the particles.
+        :param orientations: Orientation values of the particles.
+        """
+        self.particles[orientations, ys, xs] = True
+        self.occupancy_map[ys, xs] = True
+
+        xs, ys = xs.tolist(), ys.tolist()
+        orientations = orientations.cpu().numpy().astype(np.uint8)
+        self.orientation_map[ys, xs] = orientations
+        for orientation, count in enumerate(
+            np.bincount(orientations, minlength=self.NUM_ORIENTATIONS)
+        ):
+            self.orientation_counts[orientation] += int(count)
+
+        # Update the particle tracking dictionaries
+        positions = list(zip(xs, ys))
+        ids = range(self.next_particle_id, self.next_particle_id + len(positions))
+        self.id_to_position.update(zip(ids, positions))
+        self.position_to_particle_id.update(zip(positions, ids))
+        self.next_particle_id += len(positions)
+
     def remove_particle(self, x: int, y: int) -> None:
         """
         Remove a particle from a specific node in the lattice.
@@ -290,11 +395,80 @@ class ParticleLattice:
         :param x: x-coordinate of the node.
         :param y: y-coordinate of the node.
         """
-        # Validate coordinates
-        self._validate_coordinates(x, y)
-        self.particles[self.orientation_map[y, x].value, y, x] = False
-        self.orientation_map[y, x] = None
+        # Validate that there is a particle to remove
+        self._validate_occupancy(x, y)
+        orientation = int(self.orientation_map[y, x])
+        self.particles[orientation, y, x] = False
+        self.orientation_map[y, x] = self.EMPTY
         self.occupancy_map[y, x] = False
+        self.orientation_counts[orientation] -= 1
+
+    def _free_cells(
+        self, region: Tuple[int, int, int, int]
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Get the empty, non-obstacle cells of a region.
+
+        :param region: A tuple of (x1, x2, y1, y2) bounding the region, bounds included.
+        :return: The x and y coordinates of the free cells, relative to (x1, y1).
+        """
+        x1, x2, y1, y2 = region
+        free_cells = ~(
+            self.occupancy_map[y1 : y2 + 1, x1 : x2 + 1]
+            | self.obstacles[y1 : y2 + 1, x1 : x2 + 1]
+        )
+        ys, xs = free_cells.nonzero(as_tuple=True)
+        return xs, ys
+
+    def _sample_free_cells(
+        self, region: Tuple[int, int, int, int], n_cells: int
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Draw distinct empty, non-obstacle cells uniformly at random within a region.
+
+        :param region: A tuple of (x1, x2, y1, y2) bounding the region, bounds included.
+        :param n_cells: The number of cells to draw.
+        :return: The x and y coordinates of the drawn cells.
+        :raises ValueError: If n_cells is negative or the region has fewer than n_cells free cells.
+        """
+        if n_cells < 0:
+            raise ValueError(f"Cannot add a negative number of particles ({n_cells}).")
+
+        x1, x2, y1, y2 = region
+        xs, ys = self._free_cells(region)
+        if n_cells > len(xs):
+            raise ValueError(
+                f"Cannot add {n_cells} particles to {len(xs)} free cells of region {region}."
+            )
+
+        # A single permutation of the free cells picks all the positions at once
+        chosen = torch.randperm(len(xs), device=device, generator=self.generator)[
+            :n_cells
+        ]
+        return xs[chosen] + x1, ys[chosen] + y1
+
+    def _get_orientations(
+        self, orientation: Optional[Orientation], n_particles: int
+    ) -> torch.Tensor:
+        """
+        Get the orientation values of particles added in bulk.
+
+        :param orientation: The orientation of the particles. Random orientations are drawn for each particle if None.
+        :param n_particles: The number of particles.
+        :return: A tensor of n_particles orientation values.
+        :raises ValueError: If orientation is neither None nor an instance of Orientation.
+        """
+        if orientation is None:
+            return torch.randint(
+                0,
+                self.NUM_ORIENTATIONS,
+                (n_particles,),
+                device=device,
+                generator=self.generator,
+            )
+        if not isinstance(orientation, Orientation):
+            raise ValueError("orientation must be an instance of Orientation enum.")
+        return torch.full((n_particles,), orientation.value, device=device)
 
     def populate(self, density: float) -> int:
         """
@@ -303,39 +477,28 @@ class ParticleLattice:
         :param density: Density of particles to be initialized.
         :return: The number of particles added to the lattice.
         """
-        num_cells = self.width * self.height - self.obstacles.sum().item()
-        num_cells = int(num_cells)
+        num_cells = self.width * self.height - self._n_obstacles
         num_particles = int(density * num_cells)
 
-        # Generate random orientations using the Orientation enum
-        positions = torch.randperm(num_cells, generator=self.generator)[:num_particles]
-
-        n_added = 0
+        xs, ys = self._sample_free_cells(
+            (0, self.width - 1, 0, self.height - 1), num_particles
+        )
 
-        for pos in positions:
-            y, x = divmod(
-                pos.item(), self.width
-            )  # Convert position to (x, y) coordinates
-            while self._is_obstacle(x, y) or not self._is_empty(x, y):
-                pos = torch.randint(
-                    num_cells, (1,), device=device, generator=self.generator
-                ).item()
-                y, x = divmod(pos, self.width)
-            self.add_particle(x, y)
-            n_added += 1
-        return n_added
+        orientations = self._get_orientations(None, num_particles)
+        self._add_particles(xs, ys, orientations)
+        return num_particles
 
     def add_particle_flux(
         self,
         region: Tuple[int, int, int, int],
-        orientation: Orientation,
+        orientation: Optional[Orientation],
         n_particles: int,
     ) -> int:
         """
         Add a particle flux to the lattice.
 
         :param region: A tuple of (x1, y1, x2, y2) representing the region where particles will be added.
-        :param orientation: The orientation of the particles.
+        :param orientation: The orientation of the particles. Random orientations are drawn for each particle if None.
         :param n_particles: The number of particles to be added.
         :return: The number of particles added to the lattice.
         """
@@ -343,43 +506,29 @@ class ParticleLattice:
         if x1 < 0 or y1 < 0 or x2 >= self.width or y2 >= self.height:
             raise ValueError(f"Region coordinates {region} are out of lattice bounds.")
 
-        n_added = 0
-        region_area = (x2 - x1 + 1) * (y2 - y1 + 1)
-        positions = np.random.choice(region_area, n_particles, replace=False)
-
-        for pos in positions:
-            y, x = divmod(pos, x2 - x1 + 1)
-            x, y = x + x1, y + y1
-            while self._is_obstacle(x, y) or not self._is_empty(x, y):
-                pos = np.random.choice(region_area)
-                y, x = divmod(pos, x2 - x1 + 1)
-                x, y = x + x1, y + y1
-            self.add_particle(x, y, orientation)
-
-            n_added += 1
-        return n_added
+        xs, ys = self._sample_free_cells(region, n_particles)
+        orientations = self._get_orientations(orientation, n_particles)
+        self._add_particles(xs, ys, orientations)
+        return n_particles
 
     def populate_region(
-        self, region: Tuple[int, int, int, int], orientation: Orientation
+        self, region: Tuple[int, int, int, int], orientation: Optional[Orientation]
     ) -> int:
         """
         Populate a region of the lattice with particles of a given orientation.
 
         :param region: A tuple of (x1, y1, x2, y2) representing the region to be populated.
-        :param orientation: The orientation of the particles to be added.
+        :param orientation: The orientation of the particles to be added. Random orientations are drawn for each particle if None.
         :return: The number of particles added to the lattice.
         """
         x1, x2, y1, y2 = region
         if x1 < 0 or y1 < 0 or x2 >= self.width or y2 >= self.height:
             raise ValueError(f"Region coordinates {region} are out of lattice bounds.")
 
-        n_added = 0
-        for y in range(y1, y2 + 1):
-            for x in range(x1, x2 + 1):
-                if self._is_empty(x, y) and not self._is_obstacle(x, y):
-                    self.add_particle(x, y, orientation)
-                    n_added += 1
-        return n_added
+        xs, ys = self._free_cells(region)
+        orientations = self._get_orientations(orientation, len(xs))
+        self._add_particles(xs + x1, ys + y1, orientations)
+        return len(xs)
 
     def get_particle_orientation(self, x: int, y: int) -> Orientation:
         """
@@ -390,7 +539,7 @@ class ParticleLattice:
         :return: The orientation of the particle as an Orientation enum instance. None if no particle is found.
         """
         self._validate_occupancy(x, y)
-        return self.orientation_map[y, x]
+        return Orientation(int(self.orientation_map[y, x]))
 
     def move_particle(self, x: int, y: int) -> List[tuple]:
         """
@@ -404,34 +553,25 @@ class ParticleLattice:
         self._validate_occupancy(
             x, y
         )  # Check if the particle exists at the given location
-        orientation = self.get_particle_orientation(x, y)
-        # Get the expected position of the particle
-        new_x, new_y = self._get_target_position(x, y, orientation)
+        orientation = int(self.orientation_map[y, x])
+        # Get the expected position of the particle, the occupancy is already validated
+        new_x = (x + self._DX[orientation]) % self.width
+        new_y = (y + self._DY[orientation]) % self.height
 
-        if self._is_obstacle(new_x, new_y):
+        if self._obstacle_map[new_y, new_x]:
             new_x, new_y = x, y
-            new_orientation = Orientation((orientation.value + 2) % 4)
+            new_orientation = Orientation((orientation + 2) % 4)
             self.reorient_particle(x, y, new_orientation)
-            return [new_x, new_y]
+            return [(new_x, new_y)]
 
         particle_id = self.position_to_particle_id.pop((x, y))
         self._update_tracking(particle_id, new_x, new_y)
 
-        if self._is_sink(new_x, new_y):
+        if self._sink_map[new_y, new_x]:
             self.remove_particle(x, y)
             return []
 
-        # Directly update the particle's position in the lattice
-        self.particles[orientation.value, y, x] = False
-        self.particles[orientation.value, new_y, new_x] = True
-
-        # Update the orientation map
-        self.orientation_map[y, x] = None
-        self.orientation_map[new_y, new_x] = orientation
-        # Update the occupancy map
-        self.occupancy_map[y, x] = False
-        self.occupancy_map[new_y, new_x] = True
-
+        self._displace_particle(x, y, new_x, new_y, orientation)
         return [(new_x, new_y)]
 
     def transport_particle(self, x: int, y: int, direction: Orientation) -> List[tuple]:
@@ -441,6 +581,7 @@ class ParticleLattice:
         :param y: Current y-coordinate of the particle.
         :return: A list of tuples representing the new position of the particle.
         :raises ValueError: If no particle is found at the given location.
+        :raises ValueError: If the target cell is occupied and is not a sink.
         """
 
         self._validate_occupancy(
@@ -451,7 +592,8 @@ class ParticleLattice:
         new_x, new_y = self._get_target_position(x, y, direction)
         if self._is_obstacle(new_x, new_y):
             return []
-        orientation = self.get_particle_orientation(x, y)
+        if not self._is_sink(new_x, new_y) and not self._is_empty(new_x, new_y):
+            raise ValueError(f"Site ({new_x}, {new_y}) is not empty.")
 
         # get the id of the particle at (x, y)
         particle_id = self.position_to_particle_id.pop((x, y), None)
@@ -460,10 +602,34 @@ class ParticleLattice:
             self.remove_particle(x, y)
             return []
 
-        self.remove_particle(x, y)
-        self.add_particle(new_x, new_y, orientation)
+        # The particle keeps its orientation and its id
+        self._displace_particle(x, y, new_x, new_y, int(self.orientation_map[y, x]))
         return [(new_x, new_y)]
 
+    def _displace_particle(
+        self, x: int, y: int, new_x: int, new_y: int, orientation: int
+    ) -> None:
+        """
+        Directly update the position of a particle in the lattice structures.
+        The target cell is assumed to be empty and free of obstacles.
+
+        :param x: Current x-coordinate of the particle.
+        :param y: Current y-coordinate of the particle.
+        :param new_x: New x-coordinate of the particle.
+        :param new_y: New y-coordinate of the particle.
+        :param orientation: Orientation value of the particle.
+        """
+        # Only the particle's orientation layer holds it, so two writes suffice
+        self.particles[orientation, y, x] = False
+        self.particles[orientation, new_y, new_x] = True
+
+        # Update the orientation map
+        self.orientation_map[y, x] = self.EMPTY
+        self.orientation_map[new_y, new_x] = orientation
+        # Update the occupancy map
+        self.occupancy_map[y, x] = False
+        self.occupancy_map[new_y, new_x] = True
+
     def reorient_particle(self, x: int, y: int, new_orientation: Orientation) -> bool:
         """
         Reorient a particle at (x, y) to a new orientation.
@@ -479,12 +645,16 @@ class ParticleLattice:
                 f"{new_orientation=} must be an instance of Orientation enum."
             )
 
-        current_orientation = self.get_particle_orientation(x, y)
+        self._validate_occupancy(x, y)
+        current_orientation = int(self.orientation_map[y, x])
+        new_orientation = new_orientation.value
 
         # Update the orientation in the particles tensor and orientation_map
-        self.particles[current_orientation.value, y, x] = False
-        self.particles[new_orientation.value, y, x] = True
+        self.particles[current_orientation, y, x] = False
+        self.particles[new_orientation, y, x] = True
         self.orientation_map[y, x] = new_orientation
+        self.orientation_counts[current_orientation] -= 1
+        self.orientation_counts[new_orientation] += 1
 
     ##################################
     ## Obstacle and sink management ##
@@ -506,6 +676,8 @@ class ParticleLattice:
         self._validate_availability(x, y)
 
         self.obstacles[y, x] = True
+        self._obstacle_map[y, x] = True
+        self._n_obstacles += 1
 
     def set_sink(self, x: int, y: int) -> None:
         """
@@ -522,6 +694,7 @@ class ParticleLattice:
         self._validate_coordinates(x, y)
         self._validate_availability(x, y)
         self.sinks[y, x] = True
+        self._sink_map[y, x] = True
 
     def set_obstacles(self, obstacles: torch.Tensor) -> None:
         """
@@ -532,7 +705,10 @@ class ParticleLattice:
             raise ValueError(
                 f"Obstacles tensor must match the lattice dimensions. \n >>> {obstacles.shape=}, {(self.height, self.width)=}"
             )
-        self.obstacles = obstacles
+        # Write into the preallocated tensor rather than rebinding it
+        self.obstacles.copy_(obstacles)
+        self._obstacle_map[:] = self.obstacles.cpu().numpy()
+        self._n_obstacles = int(self._obstacle_map.sum())
 
     def set_sinks(self, sinks: torch.Tensor) -> None:
         """
@@ -541,7 +717,8 @@ class ParticleLattice:
         """
         if sinks.shape != (self.height, self.width):
             raise ValueError("Sinks tensor must match the lattice dimensions.")
-        self.sinks = sinks
+        self.sinks.copy_(sinks)
+        self._sink_map[:] = self.sinks.cpu().numpy()
 
     def set_sources(self, sources: torch.Tensor) -> None:
         """
@@ -558,94 +735,132 @@ class ParticleLattice:
     ## Transition Rates Computation ##
     ##################################
 
-    def compute_tm(self, v0: float = 1.0) -> None:
+    def compute_tm(
+        self,
+        v0: float = 1.0,
+        rows: Optional[torch.Tensor] = None,
+        out: Optional[torch.Tensor] = None,
+    ) -> torch.Tensor:
         """
         Compute the migration transition rate tensor TM with periodic boundary conditions.
-        """
-        # Calculate empty cells (where no particle nor obstacle is present)
-        empty_cells = ~self.particles.sum(dim=0).bool()
 
-        # Calculate potential moves in each direction
-        TM_up = self.particles[Orientation.UP.value] * empty_cells.roll(
-            shifts=1, dims=0
-        )
-        TM_down = self.particles[Orientation.DOWN.value] * empty_cells.roll(
-            shifts=-1, dims=0
-        )
-        TM_left = self.particles[Orientation.LEFT.value] * empty_cells.roll(
-            shifts=1, dims=1
-        )
-        TM_right = self.particles[Orientation.RIGHT.value] * empty_cells.roll(
-            shifts=-1, dims=1
+        :param v0: Base transition rate for particle movement.
+        :param rows: Indices of the lattice rows to compute. All rows if None.
+        :param out: Optional (len(rows), width) float tensor the rates are written into.
+        :return: The migration transition rate tensor for the requested rows.
+        """
+        if rows is None:
+            rows = self._rows
+
+        occupied_row_cells = self.occupancy_map[rows]
+
+        # Stack the target cells of every orientation, in orientation order, then
+        # flag the empty ones and mask them with the particles in place
+        moves = torch.stack(
+            [
+                self.occupancy_map[(rows - 1) % self.height],  # UP
+                occupied_row_cells.roll(shifts=1, dims=1),  # LEFT
+                self.occupancy_map[(rows + 1) % self.height],  # DOWN
+                occupied_row_cells.roll(shifts=-1, dims=1),  # RIGHT
+            ]
+        ).logical_not_()
+        moves &= self.particles[:, rows]
+
+        # A cell holds at most one particle, so the sum over orientations is 0 or 1
+        # and the rates are computed in a single float pass
+        moves = moves.sum(dim=0, dtype=torch.uint8)
+        if out is None:
+            return moves * float(v0)
+        return torch.mul(moves, float(v0), out=out)
+
+    def _compute_neighbour_counts(
+        self, rows: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        """
+        Count, for every cell, the nearest neighbours with each orientation.
+
+        :param rows: Indices of the lattice rows to compute. All rows if None.
+        :return: A (NUM_ORIENTATIONS, len(rows), width) tensor of neighbour counts.
+        """
+        # Sum the four shifted particle layers as bytes, with periodic boundaries:
+        # the horizontal neighbours are rolled rows, the vertical ones are rolled
+        # layers or, for a subset of rows, the rows above and below
+        if rows is None:
+            particles = self.particles.to(torch.uint8)
+            neighbours = particles.roll(shifts=1, dims=1)
+            neighbours += particles.roll(shifts=-1, dims=1)
+        else:
+            particles = self.particles[:, rows].to(torch.uint8)
+            neighbours = self.particles[:, (rows - 1) % self.height].to(torch.uint8)
+            neighbours += self.particles[:, (rows + 1) % self.height]
+        neighbours += particles.roll(shifts=1, dims=2)
+        neighbours += particles.roll(shifts=-1, dims=2)
+        return neighbours.float()
+
+    def _mix_neighbour_counts(
+        self,
+        mix: torch.Tensor,
+        rows: Optional[torch.Tensor] = None,
+        out: Optional[torch.Tensor] = None,
+    ) -> torch.Tensor:
+        """
+        Apply a mixing matrix to the neighbour counts.
+
+        :param mix: A (NUM_ORIENTATIONS, NUM_ORIENTATIONS) mixing matrix.
+        :param rows: Indices of the lattice rows to compute. All rows if None.
+        :param out: Optional contiguous tensor the mixed counts are written into.
+        :return: A (NUM_ORIENTATIONS, len(rows), width) tensor of mixed counts.
+        """
+        neighbours = self._compute_neighbour_counts(rows)
+        if out is None:
+            out = torch.empty_like(neighbours)
+        torch.matmul(
+            mix,
+            neighbours.view(self.NUM_ORIENTATIONS, -1),
+            out=out.view(self.NUM_ORIENTATIONS, -1),
         )
+        return out
 
-        # Combine all moves
-        TM = TM_up + TM_down + TM_left + TM_right
-
-        return TM * v0
-
-    def compute_log_tr(self) -> torch.Tensor:
+    def compute_log_tr(self, rows: Optional[torch.Tensor] = None) -> torch.Tensor:
         """
         Compute the reorientation transition log rate tensor.
 
-        :return: The reorientation transition log rate tensor.
+        :param rows: Indices of the lattice rows to compute. All rows if None.
+        :return: The reorientation transition log rate tensor for the requested rows.
         """
-
-        # Common kernel for convolution
-        kernel = (
-            torch.tensor(
-                [[0, 1, 0], [1, 0, 1], [0, 1, 0]], dtype=torch.float32, device=device
-            )
-            .unsqueeze(0)
-            .unsqueeze(0)
-        )
-
-        padded_particles = F.pad(self.particles, pad=(1, 1, 1, 1), mode="circular")
-        # Convolve each orientation layer of the lattice
-        log_TR_tensor = torch.zeros(
-            (ParticleLattice.NUM_ORIENTATIONS, self.height, self.width),
-            dtype=torch.float32,
-            device=device,
-        )
-        for orientation in Orientation:
-            input_tensor = (
-                padded_particles[orientation.value].unsqueeze(0).unsqueeze(0).float()
-            )
-            log_TR_tensor[orientation.value] = F.conv2d(
-                input_tensor, kernel, padding=0
-            )[0, 0]
-
         # Adjusting the log_TR tensor based on orientation vectors
-        log_TR_tensor[Orientation.UP.value], log_TR_tensor[Orientation.DOWN.value] = (
-            log_TR_tensor[Orientation.UP.value] - log_TR_tensor[Orientation.DOWN.value],
-            log_TR_tensor[Orientation.DOWN.value] - log_TR_tensor[Orientation.UP.value],
-        )
-        (
-            log_TR_tensor[Orientation.LEFT.value],
-            log_TR_tensor[Orientation.RIGHT.value],
-        ) = (
-            log_TR_tensor[Orientation.LEFT.value]
-            - log_TR_tensor[Orientation.RIGHT.value],
-            log_TR_tensor[Orientation.RIGHT.value]
-            - log_TR_tensor[Orientation.LEFT.value],
-        )
+        return self._mix_neighbour_counts(self._tr_mix, rows)
 
-        return log_TR_tensor
-
-    def compute_tr(self, g: float = 1.0) -> torch.Tensor:
+    def compute_tr(
+        self,
+        g: float = 1.0,
+        rows: Optional[torch.Tensor] = None,
+        out: Optional[torch.Tensor] = None,
+    ) -> torch.Tensor:
         """
         Compute the reorientation transition rate tensor TR.
 
         :param g: Parameter controlling alignment sensitivity. Default is 1.0.
-        :return: The reorientation transition rate tensor.
-        """
-        # Calculate occupied cells (where at least one particle is present)
-        occupied_cells = self.particles.sum(dim=0).bool()
-
-        log_tr = self.compute_log_tr()
-        tr = torch.exp(g * log_tr) * occupied_cells
-
-        return tr * (torch.ones_like(self.particles) ^ self.particles)
+        :param rows: Indices of the lattice rows to compute. All rows if None.
+        :param out: Optional contiguous (NUM_ORIENTATIONS, len(rows), width) float tensor
+            the rates are written into.
+        :return: The reorientation transition rate tensor for the requested rows.
+        """
+        if rows is None:
+            particles = self.particles
+            occupied_cells = self.occupancy_map
+        else:
+            particles = self.particles[:, rows]
+            occupied_cells = self.occupancy_map[rows]
+
+        # Fold g into the mixing matrix so that the log rates come out already
+        # scaled, then exponentiate and mask them in place: only occupied cells
+        # can reorient, and never to the current orientation of their particle
+        return (
+            self._mix_neighbour_counts(g * self._tr_mix, rows, out)
+            .exp_()
+            .mul_(~particles & occupied_cells)
+        )
 
     def compute_birth_rates(self, v0: float = 1.0) -> torch.Tensor:
         """
@@ -732,35 +947,21 @@ class ParticleLattice:
         :return: A string representation of the lattice.
         """
         index_to_symbol = self._create_index_to_symbol_mapping()
-        obstacle_symbol = "■"  # Symbol for obstacles
-        sink_symbol = "▼"  # Symbol for sinks
-        particle_in_sink_symbol = "✱"  # Symbol for particle in a sink
-        lattice_str = ""
-
-        for y in range(self.height):
-            row_str = ""
-            for x in range(self.width):
-                if self.obstacles[y, x]:
-                    row_str += obstacle_symbol
-                elif self.sinks[y, x]:
-                    if not self._is_empty(x, y):  # Check for particle in sink
-                        row_str += particle_in_sink_symbol
-                    else:
-                        row_str += sink_symbol
-                elif self._is_empty(x, y):
-                    row_str += "·"  # Use a dot for empty cells
-                else:
-                    orientation_index = self.get_particle_orientation(x, y).value
-                    symbol = index_to_symbol[orientation_index]
-                    row_str += symbol
-                row_str += " "  # Add space between cells
-            lattice_str += row_str
-            if y < self.height - 1:
-                lattice_str += (
-                    "\n"  # Add a newline character after each row except the last
-                )
-
-        return lattice_str
+
+        # Symbol of each cell state, indexed by the codes of _get_cell_states
+        cell_symbols = np.array(
+            [index_to_symbol[orientation.value] for orientation in Orientation]
+            + [
+                "·",  # Use a dot for empty cells
+                "■",  # Symbol for obstacles
+                "▼",  # Symbol for sinks
+                "✱",  # Symbol for particle in a sink
+            ]
+        )
+        grid = cell_symbols[self._get_cell_states()]
+
+        # Add a space after each cell and a newline after each row except the last
+        return "\n".join("".join(symbol + " " for symbol in row) for row in grid)
 
     def __repr__(self) -> str:
         """
@@ -816,7 +1017,6 @@ class ParticleLattice:
         return copy.deepcopy(self)
 
     def visualize_lattice(self):
-        lattice_str = ""
         index_to_symbol = self._create_index_to_symbol_mapping()
         orientation_to_color = {
             0: "red",
@@ -826,24 +1026,20 @@ class ParticleLattice:
             # Add more mappings as needed
         }
 
-        for y in range(self.height):
-            row_str = ""
-            for x in range(self.width):
-                if self.obstacles[y, x]:
-                    cell_str = "[bold white]■[/]"  # Obstacle
-                elif self.sinks[y, x]:
-                    if not self._is_empty(x, y):
-                        cell_str = "[bold cyan]✱[/]"  # Particle in sink
-                    else:
-                        cell_str = "[bold magenta]▼[/]"  # Sink
-                elif self._is_empty(x, y):
-                    cell_str = "[dim]·[/]"  # Empty cell
-                else:
-                    orientation_index = self.get_particle_orientation(x, y).value
-                    color = orientation_to_color.get(orientation_index, "white")
-                    symbol = index_to_symbol[orientation_index]
-                    cell_str = f"[bold {color}]{symbol}[/]"
-                row_str += cell_str + " "
-            lattice_str += row_str.strip() + "\n"
-
-        return lattice_str.strip()
+        # Rich markup of each cell state, indexed by the codes of _get_cell_states
+        cell_symbols = np.array(
+            [
+                f"[bold {orientation_to_color.get(orientation.value, 'white')}]"
+                f"{index_to_symbol[orientation.value]}[/]"
+                for orientation in Orientation
+            ]
+            + [
+                "[dim]·[/]",  # Empty cell
+                "[bold white]■[/]",  # Obstacle
+                "[bold magenta]▼[/]",  # Sink
+                "[bold cyan]✱[/]",  # Particle in sink
+            ]
+        )
+        grid = cell_symbols[self._get_cell_states()]
+
+        return "\n".join(" ".join(row) for row in grid)
@@ -1,4 +1,5 @@
 import torch
+import math
 import numpy as np
 from typing import Optional, Tuple
 from lvmc.core.particle_lattice import ParticleLattice, Orientation
@@ -25,18 +26,32 @@ class EventType(Enum):
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
 
+# Event type groups, built once rather than on every event classification
+REORIENTATION_EVENTS = frozenset(
+    {
+        EventType.REORIENTATION_UP,
+        EventType.REORIENTATION_LEFT,
+        EventType.REORIENTATION_DOWN,
+        EventType.REORIENTATION_RIGHT,
+    }
+)
+TRANSPORT_EVENTS = frozenset(
+    {
+        EventType.TRANSPORT_UP,
+        EventType.TRANSPORT_LEFT,
+        EventType.TRANSPORT_DOWN,
+        EventType.TRANSPORT_RIGHT,
+    }
+)
+
+
 class Event(NamedTuple):
     etype: EventType
     x: int
     y: int
 
     def is_reorientation(self) -> bool:
-        return self.etype in {
-            EventType.REORIENTATION_UP,
-            EventType.REORIENTATION_LEFT,
-            EventType.REORIENTATION_DOWN,
-            EventType.REORIENTATION_RIGHT,
-        }
+        return self.etype in REORIENTATION_EVENTS
 
     def is_migration(self) -> bool:
         return self.etype == EventType.MIGRATION
@@ -45,15 +60,15 @@ class Event(NamedTuple):
         return self.etype == EventType.BIRTH
 
     def is_transport(self) -> bool:
-        return self.etype in {
-            EventType.TRANSPORT_UP,
-            EventType.TRANSPORT_LEFT,
-            EventType.TRANSPORT_DOWN,
-            EventType.TRANSPORT_RIGHT,
-        }
+        return self.etype in TRANSPORT_EVENTS
 
 
 class Simulation:
+    # Rate layers of the event types, bound once to avoid enum lookups per step
+    MIGRATION_INDEX = EventType.MIGRATION.value
+    BIRTH_INDEX = EventType.BIRTH.value
+    TRANSPORT_OFFSET = EventType.TRANSPORT_UP.value
+
     def __init__(
         self,
         g: float,
@@ -180,49 +195,22 @@ class Simulation:
         :param part_down: List of particle positions with a down orientation.
         :param part_right: List of particle positions with a right orientation.
         """
-        ntot = 0
-        if len(part_up) == 2:
-            if any(len(row) != len(part_up[0]) for row in part_up):
-                raise ValueError(
-                    "Input part_up must be a table with 2 rows and equal number of columns in each row"
-                )
-            n_up = len(part_up[0])
-            for i in range(n_up):
-                self.lattice.add_particle(part_up[0][i], part_up[1][i], Orientation.UP)
-            ntot += n_up
-        if len(part_left) == 2:
-            if any(len(row) != len(part_left[0]) for row in part_left):
-                raise ValueError(
-                    "Input part_left must be a table with 2 rows and equal number of columns in each row"
-                )
-            n_left = len(part_left[0])
-            for i in range(n_left):
-                self.lattice.add_particle(
-                    part_left[0][i], part_left[1][i], Orientation.LEFT
-                )
-            ntot += n_left
-        if len(part_down) == 2:
-            if any(len(row) != len(part_down[0]) for row in part_down):
-                raise ValueError(
-                    "Input part_down must be a table with 2 rows and equal number of columns in each row"
-                )
-            n_down = len(part_down[0])
-            for i in range(n_down):
-                self.lattice.add_particle(
-                    part_down[0][i], part_down[1][i], Orientation.DOWN
-                )
-            ntot += n_down
-        if len(part_right) == 2:
-            if any(len(row) != len(part_right[0]) for row in part_right):
-                raise ValueError(
-                    "Input part_right must be a table with 2 rows and equal number of columns in each row"
-                )
-            n_right = len(part_right[0])
-            for i in range(n_right):
-                self.lattice.add_particle(
-                    part_right[0][i], part_right[1][i], Orientation.RIGHT
-                )
-            ntot += n_right
+        xs, ys, orientations = [], [], []
+        for orientation, part in zip(
+            Orientation, (part_up, part_left, part_down, part_right)
+        ):
+            if len(part) == 2:
+                if any(len(row) != len(part[0]) for row in part):
+                    raise ValueError(
+                        f"Input part_{orientation.name.lower()} must be a table with 2 rows and equal number of columns in each row"
+                    )
+                xs += list(part[0])
+                ys += list(part[1])
+                orientations += [orientation] * len(part[0])
+
+        # Add all the particles in one call, so that invalid or duplicate positions
+        # across the lists are rejected before any particle is placed
+        ntot = self.lattice.add_particles(xs, ys, orientations)
 
         print(f"Added {ntot} particles to the lattice.")
         return self
@@ -249,14 +237,14 @@ class Simulation:
     def add_particle_flux(
         self,
         region: Tuple[int, int, int, int],
-        orientation: Orientation,
+        orientation: Optional[Orientation],
         n_particles: int,
     ) -> None:
         """
         Add a particle flux to the lattice.
 
         :param region: A tuple (x1, y1, x2, y2) representing the region where the particles will be added.
-        :param orientation: The orientation of the particles.
+        :param orientation: The orientation of the particles, random for each particle if None.
         :param n_particles: The number of particles to be added.
         """
         self.lattice.add_particle_flux(region, orientation, n_particles)
@@ -279,33 +267,46 @@ class Simulation:
             self.n_event_types, self.height, self.width, device=device
         )
 
-    def compute_rates(self) -> None:
+    def compute_rates(self, rows: Optional[torch.Tensor] = None) -> None:
         """
         Compute the rates of the different events on the lattice.
+
+        :param rows: Indices of the lattice rows whose rates are recomputed. All rows if None.
         """
         ind_offset = 0
         n_orientations = len(Orientation)
-        self.rates[ind_offset:n_orientations] = self.lattice.compute_tr(self.g)
-        self.rates[EventType.MIGRATION.value] = self.lattice.compute_tm(self.v0)
+        row_index = slice(None) if rows is None else rows
+        if rows is None:
+            # Write the full lattice rates directly into the rates tensor
+            self.lattice.compute_tr(self.g, out=self.rates[ind_offset:n_orientations])
+            self.lattice.compute_tm(self.v0, out=self.rates[self.MIGRATION_INDEX])
+        else:
+            self.rates[ind_offset:n_orientations, rows] = self.lattice.compute_tr(
+                self.g, rows
+            )
+            self.rates[self.MIGRATION_INDEX, rows] = self.lattice.compute_tm(
+                self.v0, rows
+            )
         ind_offset += n_orientations + 1
         try:
             # check that sources is an attribute of the lattice
             assert hasattr(self.lattice, "sources")
-            self.rates[EventType.BIRTH.value] = self.lattice.compute_birth_rates(
-                self.v0
-            )
+            # the birth rates depend on the global density, so they are always fully updated
+            self.rates[self.BIRTH_INDEX] = self.lattice.compute_birth_rates(self.v0)
         except AssertionError:
             # print a warning if the sources attribute is not found but still assign the birth rate to the rates tensor
-            self.rates[EventType.BIRTH.value] = 0
+            self.rates[self.BIRTH_INDEX] = 0
         ind_offset += 1
 
         try:
             # check that flow is an attribute of the simulation
             assert hasattr(self, "flow")
-            self.rates[ind_offset : ind_offset + n_orientations] = self.flow.compute_tm(
-                self.lattice.occupancy_map
+            self.rates[ind_offset : ind_offset + n_orientations, row_index] = (
+                self.flow.compute_tm(self.lattice.occupancy_map, rows)
+            )
+            self.rates[:n_orientations, row_index] += self.flow.compute_tr(
+                self.lattice, rows
             )
-            self.rates[:n_orientations] += self.flow.compute_tr(self.lattice)
 
         except AssertionError:
             pass
@@ -313,12 +314,20 @@ class Simulation:
     def update_rates(self, positions: list[Optional[int]] = None) -> None:
         """
         Update the rates tensor for particles at the specified positions.
+        Only the rows holding these positions and their vertical neighbours are
+        recomputed, since the rates of a cell only depend on its nearest neighbours.
+
         :param positions: A list of tuples (x, y) representing the positions of the particles.
         """
         if positions is None:
             self.compute_rates()
-        else:
-            pass  # TODO: Implement the update_rates method for specific positions
+            return
+
+        rows = sorted(
+            {(y + dy) % self.height for _, y in positions for dy in (-1, 0, 1)}
+        )
+        if rows:
+            self.compute_rates(torch.tensor(rows, device=device))
 
     def next_event_time(self) -> float:
         """
@@ -326,14 +335,14 @@ class Simulation:
 
         :return: float - The time until the next event.
         """
-        total_rate = self.rates.sum()
+        total_rate = self.rates.sum().item()
         assert (
             total_rate > 0
         ), "Total rate must be positive to sample from Exponential distribution."
         random_value = 0
         while random_value == 0:
             random_value = torch.rand(1, generator=self.generator).item()
-        return -np.log(random_value) / total_rate
+        return -math.log(random_value) / total_rate
 
     def choose_event(self) -> Event:
         """
@@ -348,8 +357,10 @@ class Simulation:
         :return: An Event object representing the chosen event, which includes the
                 event type and the (x, y) coordinates on the lattice where it occurs.
         """
-        rates_flat = self.rates.view(-1)
-        total_rate = rates_flat.sum().item()
+        # Use cumulative sum and binary search to find the event; the total rate is
+        # the last entry of the cumulative sum, so no separate reduction is needed
+        cumulative_rates = torch.cumsum(self.rates.view(-1), dim=0)
+        total_rate = cumulative_rates[-1].item()
 
         if total_rate == 0:
             raise ValueError(
@@ -360,36 +371,13 @@ class Simulation:
         random_value = (
             torch.rand(1, device=device, generator=self.generator) * total_rate
         )
+        chosen_index = torch.searchsorted(cumulative_rates, random_value).item()
 
-        # Use cumulative sum and binary search to find the event
-        cumulative_rates = torch.cumsum(rates_flat, dim=0)
-        chosen_index = torch.searchsorted(
-            cumulative_rates,
-            random_value.to(device),
-        ).item()
-
-        # Convert the flat index back into 3D index
-        # convert the flat index back into 3D index using numpy.unravel_index because torch.unravel_index is not implemented yet
-
-        # Temporary move to CPU for np.unravel_index, if necessary
-        cpu_device = torch.device("cpu")
-        if device != torch.device("cpu"):
-            chosen_index_cpu = chosen_index
-            event_type_index, y, x = np.unravel_index(
-                chosen_index_cpu, self.rates.shape
-            )
-            # Convert results back to tensors and move to the original device
-            event_type_index, y, x = (
-                torch.tensor(event_type_index, device=device),
-                torch.tensor(y, device=device),
-                torch.tensor(x, device=device),
-            )
-            event_type_index = event_type_index.to(cpu_device).item()
-            y = y.to(cpu_device).item()
-            x = x.to(cpu_device).item()
-        else:
-            event_type_index, y, x = np.unravel_index(chosen_index, self.rates.shape)
-            # No need to move back since we're on CPU
+        # Convert the flat index back into 3D index using numpy.unravel_index because
+        # torch.unravel_index is not implemented yet; chosen_index is already on the host
+        event_type_index, y, x = (
+            int(index) for index in np.unravel_index(chosen_index, self.rates.shape)
+        )
 
         event_type = EventType(event_type_index)
 
@@ -415,11 +403,12 @@ class Simulation:
             new_pos = self.lattice.move_particle(event.x, event.y)
             return [(event.x, event.y)] + new_pos
         elif event.is_birth():
-            new_pos = self.lattice.add_particle(event.x, event.y)
-            return new_pos
+            self.lattice.add_particle(event.x, event.y)
+            return [(event.x, event.y)]
         elif event.is_transport():
-            direction = Orientation(event.etype.value - EventType.TRANSPORT_UP.value)
+            direction = Orientation(event.etype.value - self.TRANSPORT_OFFSET)
             new_pos = self.lattice.transport_particle(event.x, event.y, direction)
+            return [(event.x, event.y)] + new_pos
         else:
             raise ValueError(f"Unrecognized event type: {event.etype}")
 
@@ -435,8 +424,7 @@ class Simulation:
         self.t += self.delta_t
         event = self.choose_event()
         affected_sites = self.perform_event(event)
-        # self.update_rates(affected_sites)
-        self.update_rates()
+        self.update_rates(affected_sites)
         return event
 
     def apply_magnetic_field(self, direction: int = 0) -> None:
@@ -55,3 +55,18 @@ class TestMagneticField:
             assert (
                 field.get_current_direction() == direction
             ), "Getting current direction failed"
+
+    def test_apply_with_particles(self, lattice):
+        lattice.add_particle(0, 0, Orientation.UP)
+        lattice.add_particle(1, 1, Orientation.LEFT)
+        lattice.add_particle(2, 2, Orientation.RIGHT)
+
+        field = MagneticField(initial_direction=-1)
+        field.apply(lattice)
+
+        assert lattice.get_particle_orientation(0, 0) == Orientation.RIGHT
+        assert lattice.get_particle_orientation(1, 1) == Orientation.UP
+        assert lattice.get_particle_orientation(2, 2) == Orientation.DOWN
+        assert lattice.particles[Orientation.RIGHT.value, 0, 0]
+        assert lattice._is_empty(1, 0)
+        assert lattice.orientation_counts == [1, 0, 1, 1]
@@ -72,6 +72,36 @@ def test_set_sink_outside_bounds():
         lattice.set_sink(x, y)
 
 
+def test_set_obstacles_copies_input():
+    lattice = ParticleLattice(width=10, height=10)
+    obstacles_storage = lattice.obstacles.data_ptr()
+    obstacles = torch.zeros((10, 10), dtype=torch.bool)
+    obstacles[0, :] = True
+    lattice.set_obstacles(obstacles)
+
+    assert lattice.obstacles.data_ptr() == obstacles_storage
+    assert torch.equal(lattice.obstacles, obstacles)
+
+    # Later changes to the lattice do not leak into the input tensor
+    lattice.set_obstacle(5, 5)
+    assert not obstacles[5, 5]
+
+
+def test_set_obstacles_and_sinks_queries():
+    lattice = ParticleLattice(width=10, height=10)
+    obstacles = torch.zeros((10, 10), dtype=torch.bool)
+    obstacles[0, :] = True
+    sinks = torch.zeros((10, 10), dtype=torch.bool)
+    sinks[:, 0] = True
+    lattice.set_obstacles(obstacles)
+    lattice.set_sinks(sinks)
+
+    assert lattice._is_obstacle(3, 0)
+    assert not lattice._is_obstacle(3, 1)
+    assert lattice._is_sink(0, 3)
+    assert not lattice._is_sink(1, 3)
+
+
 def test_populate():
     lattice = ParticleLattice(width=10, height=10)
     density = 0.5
@@ -82,6 +112,104 @@ def test_populate():
     # add test for obstacles and sinks
 
 
+def test_populate_with_obstacles():
+    lattice = ParticleLattice(width=10, height=10)
+    lattice.set_obstacle(5, 5)
+    lattice.add_particle(1, 1, Orientation.UP)
+    n_added = lattice.populate(density=0.5)
+
+    assert n_added == int(0.5 * 99)
+    assert lattice.n_particles == n_added + 1
+    assert not (lattice.particles.any(dim=0) & lattice.obstacles).any()
+    assert lattice.get_particle_orientation(1, 1) == Orientation.UP
+
+
+def test_density_with_obstacles():
+    lattice = ParticleLattice(width=10, height=10)
+    obstacles = torch.zeros((10, 10), dtype=torch.bool)
+    obstacles[0, :] = True
+    lattice.set_obstacles(obstacles)
+    lattice.set_obstacle(5, 5)
+    lattice.add_particle(1, 1, Orientation.UP)
+
+    assert lattice.density == pytest.approx(1 / 89)
+
+
+def test_add_particle_flux():
+    lattice = ParticleLattice(width=10, height=10)
+    lattice.set_obstacle(1, 1)
+    n_added = lattice.add_particle_flux((0, 2, 0, 2), Orientation.DOWN, 8)
+
+    assert n_added == 8
+    assert lattice.orientation_counts == [0, 0, 8, 0]
+    assert lattice.particles[:, :3, :3].sum() == 8
+    assert lattice._is_empty(1, 1)
+
+    # The region is now full
+    with pytest.raises(ValueError):
+        lattice.add_particle_flux((0, 2, 0, 2), Orientation.DOWN, 1)
+
+
+def test_add_particle_flux_random_orientations():
+    lattice = ParticleLattice(width=10, height=10)
+    lattice.add_particle_flux((0, 9, 0, 9), None, 60)
+
+    assert lattice.n_particles == 60
+    assert lattice.particles.sum() == 60
+    assert (lattice.orientation_map[lattice.orientation_map != lattice.EMPTY] < 4).all()
+
+    with pytest.raises(ValueError):
+        lattice.add_particle_flux((0, 9, 0, 9), 1, 1)
+
+
+def test_add_particle_flux_negative_count():
+    lattice = ParticleLattice(width=10, height=10)
+    with pytest.raises(ValueError):
+        lattice.add_particle_flux((0, 2, 0, 2), Orientation.UP, -1)
+    with pytest.raises(ValueError):
+        lattice.populate(density=-0.5)
+    assert lattice.n_particles == 0
+
+
+def test_add_particle_flux_reproducible():
+    lattices = [
+        ParticleLattice(width=10, height=10, generator=torch.Generator().manual_seed(0))
+        for _ in range(2)
+    ]
+    for lattice in lattices:
+        lattice.add_particle_flux((2, 7, 2, 7), Orientation.UP, 10)
+    assert torch.equal(lattices[0].particles, lattices[1].particles)
+
+
+def test_populate_region():
+    lattice = ParticleLattice(width=10, height=10)
+    lattice.set_obstacle(2, 3)
+    lattice.add_particle(3, 3, Orientation.UP)
+    n_added = lattice.populate_region((1, 4, 2, 5), Orientation.RIGHT)
+
+    assert n_added == 4 * 4 - 2
+    assert lattice.n_particles == n_added + 1
+    assert lattice.get_particle_orientation(3, 3) == Orientation.UP
+    assert lattice.get_particle_orientation(4, 5) == Orientation.RIGHT
+    assert lattice._is_empty(2, 3)
+    assert lattice._is_empty(0, 2)
+    assert len(lattice.position_to_particle_id) == lattice.n_particles
+
+
+def test_populate_region_random_orientations():
+    lattice = ParticleLattice(width=10, height=10)
+    n_added = lattice.populate_region((0, 2, 0, 2), None)
+
+    assert n_added == 9
+    assert lattice.n_particles == 9
+    assert sum(lattice.orientation_counts) == 9
+    assert (lattice.orientation_map[:3, :3] < 4).all()
+
+    with pytest.raises(ValueError):
+        lattice.populate_region((3, 5, 3, 5), 1)
+    assert lattice.n_particles == 9
+
+
 def test__is_empty():
     lattice = ParticleLattice(width=10, height=10)
     assert lattice._is_empty(5, 5) == True
@@ -97,6 +225,40 @@ def test_add_particle():
     assert lattice.particles[orientation.value, y, x] == True
 
 
+def test_add_particles():
+    lattice = ParticleLattice(width=10, height=10)
+    n_added = lattice.add_particles([1, 2, 3], [4, 5, 6], Orientation.LEFT)
+    assert n_added == 3
+    for x, y in [(1, 4), (2, 5), (3, 6)]:
+        assert lattice.get_particle_orientation(x, y) == Orientation.LEFT
+
+    with pytest.raises(IndexError):
+        lattice.add_particles([0, 10], [0, 0], Orientation.UP)
+    with pytest.raises(ValueError):
+        lattice.add_particles([7, 7], [7, 7], Orientation.UP)
+    with pytest.raises(ValueError):
+        lattice.add_particles([1], [4], Orientation.UP)
+    with pytest.raises(ValueError):
+        lattice.add_particles([7, 8, 9], [4], Orientation.UP)
+    with pytest.raises(ValueError):
+        lattice.add_particles([[7, 8]], [[4, 4]], Orientation.UP)
+    assert lattice.n_particles == 3
+    assert len(lattice.position_to_particle_id) == 3
+
+
+def test_add_particles_scalar_orientations():
+    lattice = ParticleLattice(width=10, height=10)
+    with pytest.raises(ValueError):
+        lattice.add_particles([1, 2], [4, 5], 1)
+    assert lattice.n_particles == 0
+
+    n_added = lattice.add_particles([1, 2, 3], [4, 5, 6], None)
+    assert n_added == 3
+    for x, y in [(1, 4), (2, 5), (3, 6)]:
+        assert isinstance(lattice.get_particle_orientation(x, y), Orientation)
+    assert sum(lattice.orientation_counts) == 3
+
+
 def test_add_particle_outside_bounds():
     lattice = ParticleLattice(width=10, height=10)
     x, y = 11, 11
@@ -151,6 +313,34 @@ def test_remove_particle_outside_bounds():
         lattice.remove_particle(x, y)
 
 
+def test_remove_particle_on_empty_cell():
+    lattice = ParticleLattice(width=10, height=10)
+    with pytest.raises(ValueError):
+        lattice.remove_particle(5, 5)
+
+
+def test_orientation_map():
+    lattice = ParticleLattice(width=10, height=10)
+    assert (lattice.orientation_map == lattice.EMPTY).all()
+    lattice.add_particle(5, 5, Orientation.LEFT)
+    assert lattice.orientation_map[5, 5] == Orientation.LEFT.value
+    lattice.remove_particle(5, 5)
+    assert lattice.orientation_map[5, 5] == lattice.EMPTY
+
+
+def test_orientation_counts():
+    lattice = ParticleLattice(width=10, height=10)
+    lattice.add_particle(1, 1, Orientation.UP)
+    lattice.add_particle(2, 2, Orientation.UP)
+    lattice.add_particle(3, 3, Orientation.RIGHT)
+    assert lattice.orientation_counts == [2, 0, 0, 1]
+
+    lattice.reorient_particle(1, 1, Orientation.DOWN)
+    lattice.remove_particle(3, 3)
+    assert lattice.orientation_counts == [1, 0, 1, 0]
+    assert lattice.n_particles == lattice.particles.sum().item()
+
+
 def test_query_lattice_state():
     lattice = ParticleLattice(width=10, height=10)
     lattice.populate(density=0.5)
@@ -215,6 +405,19 @@ def test_compute_tm():
         assert tm[position[1], position[0]] == 0
 
 
+def test_compute_tm_out_with_large_integer_v0():
+    lattice = ParticleLattice(width=10, height=10)
+    v0 = 300
+    for position, ori in zip([(0, 0), (0, 1), (0, 2), (0, 3)], Orientation):
+        lattice.add_particle(position[0], position[1], ori)
+
+    out = torch.empty(lattice.height, lattice.width)
+    tm = lattice.compute_tm(v0, out=out)
+
+    assert torch.equal(tm, lattice.compute_tm(v0))
+    assert tm[0, 0] == v0
+
+
 def test_compute_tr():
     # Create a ParticleLattice instance
     lattice = ParticleLattice(width=10, height=10)
@@ -232,6 +435,64 @@ def test_compute_tr():
                     assert tr[orientation, y, x] != 0
 
 
+
+def _build_wrapping_lattice():
+    # A particle at (0, 0) whose left and upper neighbours sit across the
+    # column-0 and row-0 edges of the periodic lattice
+    lattice = ParticleLattice(width=4, height=4)
+    lattice.add_particle(0, 0, Orientation.UP)
+    lattice.add_particle(3, 0, Orientation.UP)
+    lattice.add_particle(0, 3, Orientation.DOWN)
+    lattice.add_particle(1, 0, Orientation.LEFT)
+    return lattice
+
+
+def test_compute_log_tr_values():
+    lattice = _build_wrapping_lattice()
+    log_tr = lattice.compute_log_tr()
+
+    # n_same - n_opposite for every orientation, counted by hand
+    assert log_tr[:, 0, 0].tolist() == [0, 1, 0, -1]
+    assert log_tr[:, 0, 3].tolist() == [1, 0, -1, 0]
+    assert log_tr[:, 3, 0].tolist() == [1, 0, -1, 0]
+    assert log_tr[:, 0, 1].tolist() == [1, 0, -1, 0]
+    assert log_tr[:, 0, 2].tolist() == [1, 1, -1, -1]
+
+    # Every other cell against a direct count of the four periodic neighbours
+    for y in range(lattice.height):
+        for x in range(lattice.width):
+            counts = [0] * lattice.NUM_ORIENTATIONS
+            for dx, dy in [(0, -1), (-1, 0), (0, 1), (1, 0)]:
+                nx, ny = (x + dx) % lattice.width, (y + dy) % lattice.height
+                if not lattice._is_empty(nx, ny):
+                    counts[lattice.get_particle_orientation(nx, ny).value] += 1
+            expected = [counts[o] - counts[(o + 2) % 4] for o in range(4)]
+            assert log_tr[:, y, x].tolist() == expected
+
+    rows = torch.tensor([0, 3])
+    assert torch.equal(lattice.compute_log_tr(rows=rows), log_tr[:, rows])
+
+
+@pytest.mark.parametrize("g", [1.0, 2.0])
+def test_compute_tr_values(g):
+    lattice = _build_wrapping_lattice()
+    tr = lattice.compute_tr(g)
+
+    # exp(g * log_tr), zero in empty cells and in the layer of each particle
+    e = np.exp(g)
+    expected = torch.zeros(lattice.NUM_ORIENTATIONS, lattice.height, lattice.width)
+    expected[:, 0, 0] = torch.tensor([0, e, 1, 1 / e])
+    expected[:, 0, 3] = torch.tensor([0, 1, 1 / e, 1])
+    expected[:, 3, 0] = torch.tensor([e, 1, 0, 1])
+    expected[:, 0, 1] = torch.tensor([e, 0, 1 / e, 1])
+    assert torch.allclose(tr, expected)
+
+    # The particle at (1, 0) has a single aligned UP neighbour
+    assert torch.isclose(tr[Orientation.UP.value, 0, 1], torch.tensor(float(e)))
+
+    rows = torch.tensor([0, 3])
+    assert torch.allclose(lattice.compute_tr(g, rows=rows), expected[:, rows])
+
 def test_compute_tr_with_obstacles():
     # Create a ParticleLattice instance
     lattice = ParticleLattice(width=10, height=10)
@@ -582,6 +843,23 @@ def test_transport_particle():
     assert lattice.get_particle_orientation(x_new, y_new) == original_orientation
 
 
+def test_transport_particle_keeps_id():
+    lattice = ParticleLattice(width=10, height=10)
+    lattice.add_particle(5, 5, Orientation.UP)
+    lattice.add_particle(7, 5, Orientation.DOWN)
+
+    assert lattice.transport_particle(5, 5, Orientation.RIGHT) == [(6, 5)]
+    assert lattice.id_to_position[0] == (6, 5)
+    assert lattice.position_to_particle_id[(6, 5)] == 0
+    assert lattice.n_particles == 2
+
+    # Transport into an occupied cell fails without losing the particle
+    with pytest.raises(ValueError):
+        lattice.transport_particle(6, 5, Orientation.RIGHT)
+    assert lattice.get_particle_orientation(6, 5) == Orientation.UP
+    assert lattice.n_particles == 2
+
+
 def test_reflective_boundary_conditions():
     lattice = ParticleLattice(width=10, height=10)
     lattice.add_particle(5, 5, Orientation.UP)
@@ -614,3 +892,50 @@ def test_reflective_boundary_conditions():
     assert lattice._is_obstacle(0, 2)
     assert lattice._is_obstacle(9, 8)
     assert lattice._is_obstacle(5, 1)
+
+
+def test_visualize_lattice():
+    lattice = ParticleLattice(width=3, height=2)
+    lattice.set_obstacle(0, 0)
+    lattice.set_sink(1, 1)
+    lattice.add_particle(2, 0, Orientation.LEFT)
+    lattice.add_particle(1, 1, Orientation.UP)
+
+    assert lattice.visualize_lattice() == (
+        "[bold white]■[/] [dim]·[/] [bold green]←[/]\n"
+        "[dim]·[/] [bold cyan]✱[/] [dim]·[/]"
+    )
+
+
+def test_str():
+    lattice = ParticleLattice(width=3, height=2)
+    lattice.set_obstacle(0, 0)
+    lattice.set_sink(0, 1)
+    lattice.set_sink(1, 1)
+    lattice.add_particle(2, 0, Orientation.LEFT)
+    lattice.add_particle(1, 1, Orientation.UP)
+
+    assert str(lattice) == "■ · ← \n▼ ✱ · "
+
+
+def test_compute_rates_return_new_tensors():
+    lattice = ParticleLattice(width=10, height=10)
+    lattice.populate(density=0.5)
+    tr = lattice.compute_tr(1.0)
+    tm = lattice.compute_tm(1.0)
+    expected_tr, expected_tm = tr.clone(), tm.clone()
+    lattice.compute_tr(1.0, rows=torch.tensor([2, 3]))
+    lattice.compute_tm(1.0, rows=torch.tensor([2, 3]))
+
+    assert torch.equal(tr, expected_tr)
+    assert torch.equal(tm, expected_tm)
+
+
+def test_compute_log_tr_not_overwritten_by_compute_tr():
+    lattice = ParticleLattice(width=10, height=10)
+    lattice.populate(density=0.5)
+    log_tr = lattice.compute_log_tr()
+    expected = log_tr.clone()
+    lattice.compute_tr(g=2.0)
+
+    assert torch.equal(log_tr, expected)
@@ -37,3 +37,43 @@ class TestSimulation:
         event = simulation.choose_event()
         simulation.perform_event(event)
         # check that the number of particles is conserved
+
+    def test_run(self, simulation):
+        event = simulation.run()
+        assert type(simulation.t) is float
+        assert simulation.t > 0
+        assert isinstance(event.x, int) and isinstance(event.y, int)
+
+    def test_update_rates_matches_full_recomputation(self):
+        lattice_obstacles = torch.zeros((12, 16), dtype=torch.bool)
+        lattice_obstacles[0, :] = True
+        lattice_obstacles[-1, :] = True
+        simulation = (
+            Simulation(g, v0, seed=1337)
+            .add_lattice(width=16, height=12)
+            .add_flow(flow_params)
+            .add_obstacles(lattice_obstacles)
+            .add_particles(density=density)
+            .build()
+        )
+        for _ in range(200):
+            simulation.run()
+            partial_rates = simulation.rates.clone()
+            simulation.compute_rates()
+            assert torch.allclose(partial_rates, simulation.rates)
+
+    def test_add_particles_from_list(self):
+        simulation = (
+            Simulation(g, v0, seed=1337)
+            .add_lattice(width=width, height=height)
+            .add_particles_from_list([[1, 2], [1, 1]], [], [], [[3], [2]])
+        )
+        assert simulation.lattice.orientation_counts == [2, 0, 0, 1]
+
+        # A position shared by two lists is rejected before any particle is placed
+        simulation = Simulation(g, v0, seed=1337).add_lattice(
+            width=width, height=height
+        )
+        with pytest.raises(ValueError):
+            simulation.add_particles_from_list([[1], [1]], [], [], [[1], [1]])
+        assert simulation.lattice.n_particles == 0